@@ -1,18 +1,33 @@
 import json
 import argparse
 import sys
-import copy
 import os
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 def load_json(path):
-    with open(path, 'r') as f:
-        return json.load(f)
+    with open(path, 'rb') as f:
+        raw = f.read()
+    return orjson.loads(raw) if orjson else json.loads(raw)
+
+def dump_json(data):
+    """
+    Serializes data as 2-space indented UTF-8 JSON bytes.
+    The json fallback writes non-ASCII text unescaped like orjson does, so both give
+    the same bytes for float-free data (float exponents can differ: 1e20 vs 1e+20).
+    """
+    if orjson:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
 
 def save_json(data, path, force=False):
-    new_content = json.dumps(data, indent=2)
+    new_content = dump_json(data)
     
     if not force and os.path.exists(path):
-        with open(path, 'r') as f:
+        with open(path, 'rb') as f:
             try:
                 old_content = f.read()
                 if old_content == new_content:
@@ -20,9 +35,36 @@ def save_json(data, path, force=False):
                     return
             except: pass # Read error, just overwrite
             
-    with open(path, 'w') as f:
+    with open(path, 'wb') as f:
         f.write(new_content)
 
+# Marks a diff entry as a nested add/remove diff for a property's own properties, as
+# opposed to a full property definition taken from the target schema.
+NESTED = "__nested__"
+
+# id(node) -> (node, unwrapped). The node itself is kept so a recycled id can never
+# produce a stale hit. Cleared at the start of every diff pass in main().
+_unwrap_cache = {}
+
+def _unwrap(s):
+    """Returns the object schema carrying "properties", looking through oneOf/items wrappers."""
+    hit = _unwrap_cache.get(id(s))
+    if hit is not None and hit[0] is s:
+        return hit[1]
+
+    result = s
+    if "properties" not in s and "oneOf" in s:
+        for opt in s["oneOf"]:
+            if "properties" in opt:
+                result = opt
+                break
+            if "items" in opt and "properties" in opt["items"]:
+                result = opt["items"]
+                break
+
+    _unwrap_cache[id(s)] = (s, result)
+    return result
+
 def deep_diff_structure(base, target):
     """
     Returns a diff of properties that should be ADDED or REMOVED to align base with target.
@@ -34,6 +76,8 @@ def deep_diff_structure(base, target):
     properties have the correct curated definition, and we want to preserve that.
     
     We only look at the presence/absence of keys in "properties" dictionaries recursively.
+    Changes inside an existing property are recorded as {NESTED: sub_diff} so apply_diff
+    can tell them apart from new property definitions without inspecting their keys.
     """
     diff = {
         "add": {},
@@ -45,35 +89,31 @@ def deep_diff_structure(base, target):
     target_props = target.get("properties", {})
     
     # 1. Properties to Remove (in Base but not in Target)
-    for key in list(base_props.keys()):
+    for key in base_props:
         if key not in target_props:
            diff["remove"][key] = True
         else:
             # Recurse if object
              base_sub = base_props[key]
              target_sub = target_props[key]
+             if base_sub is target_sub:
+                 continue # Shared subtree, nothing can differ
              
              # Handle OneOf wrappers in Generated schemas (Curated might have simplified)
              # The generated schema wraps repeated sections in OneOf [Array, Object].
              # Curated usually simplifies or keeps consistent.
              # We need to unwrap to compare the actual object properties.
-             
-             def unwrap(s):
-                 if "properties" in s: return s
-                 if "oneOf" in s:
-                     for opt in s["oneOf"]:
-                         if "properties" in opt: return opt
-                         if "items" in opt and "properties" in opt["items"]: return opt["items"]
-                 return s
-
-             base_obj = unwrap(base_sub)
-             target_obj = unwrap(target_sub)
+             base_obj = _unwrap(base_sub)
+             target_obj = _unwrap(target_sub)
              
              if "properties" in base_obj and "properties" in target_obj:
                  sub_diff = deep_diff_structure(base_obj, target_obj)
-                 if sub_diff["add"] or sub_diff["remove"]:
-                     diff["add"][key] = sub_diff["add"]
-                     diff["remove"][key] = sub_diff["remove"]
+                 # Only record the side that has changes; apply_diff treats a
+                 # missing key as nothing to do.
+                 if sub_diff["add"]:
+                     diff["add"][key] = {NESTED: sub_diff["add"]}
+                 if sub_diff["remove"]:
+                     diff["remove"][key] = {NESTED: sub_diff["remove"]}
 
     # 2. Properties to Add (in Target but not in Base)
     for key in target_props:
@@ -82,56 +122,122 @@ def deep_diff_structure(base, target):
              
     return diff
 
+def _fast_copy(node):
+    """
+    Deep-copies a JSON tree (dicts, lists and immutable scalars).
+
+    Stack based, with no memo table or __reduce__ dispatch, which makes it much
+    cheaper than copy.deepcopy for plain parsed JSON.
+    """
+    t = type(node)
+    if t is not dict and t is not list:
+        return node
+    root = dict(node) if t is dict else list(node)
+    stack = [root]
+    while stack:
+        obj = stack.pop()
+        if type(obj) is dict:
+            for k, v in obj.items():
+                vt = type(v)
+                if vt is dict:
+                    v = obj[k] = dict(v)
+                    stack.append(v)
+                elif vt is list:
+                    v = obj[k] = list(v)
+                    stack.append(v)
+        else:
+            for i, v in enumerate(obj):
+                vt = type(v)
+                if vt is dict:
+                    v = obj[i] = dict(v)
+                    stack.append(v)
+                elif vt is list:
+                    v = obj[i] = list(v)
+                    stack.append(v)
+    return root
+
+def cow_clone_path(node, add, remove):
+    """
+    Returns a copy of node with the add/remove diff applied to its properties.
+
+    Only the dicts and lists on the path to a mutation are copied; every untouched
+    subtree keeps its original object identity and is shared with node. Generated
+    schemas wrap repeated sections in oneOf [Array, Object], so the diff is applied
+    to the first variant that carries properties (directly or via items).
+    """
+    if not add and not remove:
+        return node
+
+    if "properties" not in node:
+        if "oneOf" in node:
+            for i, opt in enumerate(node["oneOf"]):
+                if "properties" in opt:
+                    new_opt = cow_clone_path(opt, add, remove)
+                elif "items" in opt and "properties" in opt["items"]:
+                    new_opt = dict(opt)
+                    new_opt["items"] = cow_clone_path(opt["items"], add, remove)
+                else:
+                    continue
+                clone = dict(node)
+                clone["oneOf"] = list(node["oneOf"])
+                clone["oneOf"][i] = new_opt
+                return clone
+        # Curated often uses allOf $ref; we can't delete a property *inside* the
+        # ref definition, so leave it untouched.
+        return node
+
+    clone = dict(node)
+    props = clone["properties"] = dict(node["properties"])
+
+    # Remove
+    for k, v in remove.items():
+        if v is True: # Leaf removal
+            if k in props:
+                print(f"  - Removing {k}")
+                del props[k]
+        elif isinstance(v, dict) and NESTED in v: # Recursive removal
+            if k in props:
+                props[k] = cow_clone_path(props[k], {}, v[NESTED])
+
+    # Add property
+    for k, v in add.items():
+        if isinstance(v, dict) and NESTED in v:
+            # It's a nested diff
+            if k in props:
+                props[k] = cow_clone_path(props[k], v[NESTED], {})
+        else:
+            # It's a new property definition. Copy it so later in-place rewrites of
+            # the result never reach back into the target schema.
+            print(f"  + Adding {k}")
+            props[k] = _fast_copy(v)
+
+    return clone
+
 def apply_diff(curated, diff):
-    result = copy.deepcopy(curated)
-    
-    def apply_recursive(obj, d_add, d_remove):
-        if "properties" not in obj: return
-        
-        props = obj["properties"]
-        
-        # Remove
-        for k, v in d_remove.items():
-            if v is True: # Leaf removal
-                if k in props:
-                    print(f"  - Removing {k}")
-                    del props[k]
-            elif isinstance(v, dict): # Recursive removal
-                if k in props:
-                    # Unwrap Curated if needed
-                     def unwrap(s):
-                         if "properties" in s: return s
-                         if "oneOf" in s:
-                             for opt in s["oneOf"]:
-                                 if "properties" in opt: return opt
-                                 if "items" in opt and "properties" in opt["items"]: return opt["items"]
-                         if "allOf" in s: # Curated often uses allOf $ref
-                             # This is tricky. If it's a ref, we can't delete a property *inside* the ref definition easily.
-                             # But here we are usually comparing Sections or Properties of Sections.
-                             # If 'k' is a Section, it has properties.
-                             return s
-                         return s
-                    
-                     sub = unwrap(props[k])
-                     if sub and "properties" in sub:
-                         apply_recursive(sub, {}, v)
-                         
-        # Add property
-        for k, v in d_add.items():
-             if isinstance(v, dict) and "properties" not in v and "type" not in v and "oneOf" not in v:
-                 # It's a nested diff
-                 if k in props:
-                     sub = unwrap(props[k])
-                     if sub and "properties" in sub:
-                         apply_recursive(sub, v, {})
-             else:
-                 # It's a new property definition
-                 print(f"  + Adding {k}")
-                 props[k] = v
-
-    apply_recursive(result, diff["add"], diff["remove"])
+    """
+    Applies a diff from deep_diff_structure to the curated schema.
+
+    The curated schema itself is never mutated. The result shares all subtrees that
+    the diff does not touch with curated, so callers that rewrite the result in
+    place should not reuse curated afterwards.
+    """
+    result = cow_clone_path(curated, diff["add"], diff["remove"])
+    if result is curated:
+        result = dict(curated)
     return result
 
+def get_schema_version(schema, path):
+    """
+    Returns the version tag (e.g. "v245") of a generated schema.
+
+    The title "Systemd network Configuration (v245)" is authoritative; the filename
+    ("systemd.network.v245.schema.json") is only used when the title carries no version.
+    """
+    _, sep, tail = schema.get("title", "").rpartition("(")
+    if sep and tail.endswith(")"):
+        return tail[:-1].strip()
+    return os.path.basename(path).split('.')[-3]
+
 def main():
     parser = argparse.ArgumentParser(description="Derive a curated schema for a target version.")
     parser.add_argument("--curated-base", required=True, help="Path to Curated vBase schema")
@@ -143,6 +249,8 @@ def main():
     
     args = parser.parse_args()
     
+    _unwrap_cache.clear()
+
     print(f"Loading schemas...")
     curated_base = load_json(args.curated_base)
     generated_base = load_json(args.generated_base)
@@ -156,17 +264,15 @@ def main():
     new_schema = apply_diff(curated_base, diff)
     
     # Update Metadata
+    target_ver = get_schema_version(generated_target, args.generated_target)
+    target_ver_clean = target_ver.lstrip('v') # "v241" -> "241"
     if "title" in new_schema:
         # Update version in title "Systemd ... (v257)" -> (vTarget)
-        # We assume generated_target['title'] has the correct version string
-        target_ver = args.generated_target.split('.')[-3] # naive file parsing or extract from title
         new_schema["title"] = f"{new_schema['title'].split('(')[0].strip()} ({target_ver})"
         
     new_schema["$id"] = args.id_url
 
     # Update documentation links to point to the correct version
-    target_ver_clean = args.generated_target.split('.')[-3].replace('v', '') # extract "241" from "...v241..."
-    
     # Convert version to int for comparison
     try:
         target_ver_int = int(target_ver_clean)
@@ -175,31 +281,47 @@ def main():
         # For this specific task, we assume version numbers are integers as seen in paths
         target_ver_int = 999 
 
-    def update_doc_links(obj):
-        if isinstance(obj, dict):
-            # Iterate over a list of keys so we can modify the dict
-            for k, v in list(obj.items()):
-                if k == "documentation" and isinstance(v, string_types):
-                     if target_ver_int < 247:
-                         del obj[k]
-                     else:
-                         # specific replace for the version in the URL
-                         # Match: .../man/257/... -> .../man/{target_ver_clean}/...
-                         # Match: .../v257/... -> .../v{target_ver}/... (GitHub Pages)
-                         
-                         if "/v257/" in v:
-                              obj[k] = v.replace("/v257/", f"/{target_ver}/")
-                         elif "/man/257/" in v:
-                              obj[k] = v.replace("/man/257/", f"/man/{target_ver_clean}/")
-                else:
-                    update_doc_links(v)
-        elif isinstance(obj, list):
-            for item in obj:
-                update_doc_links(item)
-
-    # Python 3 compatibility for string check
-    string_types = (str,)
-    update_doc_links(new_schema)
+    # Everything the walker needs is bound as default arguments so it reads them as
+    # fast locals rather than closure cells.
+    def update_doc_links(root, pages_repl=f"/{target_ver}/", man_repl=f"/man/{target_ver_clean}/",
+                         drop_links=target_ver_int < 247, _str=str, _dict=dict, _list=list):
+        # Iterative walk with an explicit stack: merged schemas have tens of thousands
+        # of nodes and a call frame per node dominates the pass. JSON only produces
+        # plain dicts and lists, so exact type checks are enough.
+        stack = [root]
+        pop = stack.pop
+        push = stack.append
+        while stack:
+            obj = pop()
+            t = type(obj)
+            if t is _dict:
+                # Only "documentation" is ever rewritten, so handle it up front and
+                # iterate the values without copying the items.
+                v = obj.get("documentation")
+                if type(v) is _str:
+                    if drop_links:
+                        del obj["documentation"]
+                    else:
+                        # specific replace for the version in the URL
+                        # Match: .../man/257/... -> .../man/{target_ver_clean}/...
+                        # Match: .../v257/... -> .../v{target_ver}/... (GitHub Pages)
+                        # The "in" checks skip allocating an identical string for
+                        # links that carry no version marker.
+                        if "/v257/" in v:
+                            obj["documentation"] = v.replace("/v257/", pages_repl)
+                        elif "/man/257/" in v:
+                            obj["documentation"] = v.replace("/man/257/", man_repl)
+                for v in obj.values():
+                    vt = type(v)
+                    if vt is _dict or vt is _list:
+                        push(v)
+            elif t is _list:
+                stack.extend(obj)
+
+    # Curated links already point at the base version, so deriving that same version
+    # needs no rewrite pass at all.
+    if target_ver != get_schema_version(curated_base, args.curated_base):
+        update_doc_links(new_schema)
 
     print(f"Saving to {args.out}")
     save_json(new_schema, args.out, force=args.force)
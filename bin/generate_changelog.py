@@ -2,15 +2,30 @@ import os
 import json
 import argparse
 import glob
+import html
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Map doc name to HTML filename
+HTML_MAP = {
+    "systemd.network": "systemd.network.html",
+    "systemd.netdev": "systemd.netdev.html",
+    "systemd.link": "systemd.link.html",
+    "systemd.networkd.conf": "networkd.conf.html"
+}
 
 def load_schema(version_dir, schema_name):
     """Loads a specific schema file from a version directory."""
     path = os.path.join(version_dir, f"{schema_name}.schema.json")
-    if not os.path.exists(path):
-         return {}
-    
-    with open(path, 'r') as f:
-        return json.load(f)
+    try:
+        with open(path, 'rb') as f:
+            raw = f.read()
+    except FileNotFoundError:
+        return {}
+    return orjson.loads(raw) if orjson else json.loads(raw)
 
 def flatten_properties(schema, definitions=None):
     """
@@ -21,12 +36,23 @@ def flatten_properties(schema, definitions=None):
     if definitions is None:
         definitions = schema.get('definitions', {})
 
-    # Helper to resolve $ref
+    # Helper to resolve $ref, memoized per ref string (shared types are referenced many times).
+    # Follows the chain iteratively and stops at unknown or cyclic refs.
+    resolved = {}
     def resolve_ref(node):
-        if '$ref' in node:
-            ref = node['$ref'].split('/')[-1]
-            if ref in definitions:
-                return resolve_ref(definitions[ref])
+        chain = []
+        while '$ref' in node:
+            ref = node['$ref']
+            if ref in resolved:
+                node = resolved[ref]
+                break
+            name = ref.rsplit('/', 1)[-1]
+            if name not in definitions or ref in chain:
+                break
+            chain.append(ref)
+            node = definitions[name]
+        for ref in chain:
+            resolved[ref] = node
         return node
 
     # Iterate sections
@@ -48,6 +74,11 @@ def flatten_properties(schema, definitions=None):
             
     return options
 
+def load_options(version_dir, schema_name):
+    """Returns the flattened options of a schema, or None if it is missing or empty."""
+    schema = load_schema(version_dir, schema_name)
+    return flatten_properties(schema) if schema else None
+
 def compare_versions(prev_dir, curr_dir):
     """
     Compares schemas in two directories.
@@ -62,31 +93,32 @@ def compare_versions(prev_dir, curr_dir):
         sname = fname
         if fname == "systemd.networkd.conf": sname = "systemd.networkd.conf"
         
-        prev_schema = load_schema(prev_dir, sname)
-        curr_schema = load_schema(curr_dir, sname)
+        prev_opts = load_options(prev_dir, sname)
+        curr_opts = load_options(curr_dir, sname)
         
-        if not prev_schema and not curr_schema:
+        if prev_opts is None and curr_opts is None:
             continue
             
         changes[fname] = {'added': [], 'removed': [], 'deprecated': []}
         
-        prev_opts = flatten_properties(prev_schema) if prev_schema else {}
-        curr_opts = flatten_properties(curr_schema) if curr_schema else {}
+        # Doc only exists on one side: everything was added (or removed)
+        if prev_opts is None:
+            changes[fname]['added'] = sorted(curr_opts)
+            continue
+        if curr_opts is None:
+            changes[fname]['removed'] = sorted(prev_opts)
+            continue
         
-        all_keys = set(prev_opts.keys()) | set(curr_opts.keys())
+        prev_keys = prev_opts.keys()
+        curr_keys = curr_opts.keys()
         
-        for key in sorted(all_keys):
-            if key not in prev_opts:
-                changes[fname]['added'].append(key)
-            elif key not in curr_opts:
-                changes[fname]['removed'].append(key)
-            else:
-                # Check deprecation
-                is_dep_curr = curr_opts[key].get('deprecated', False)
-                is_dep_prev = prev_opts[key].get('deprecated', False)
-                
-                if is_dep_curr and not is_dep_prev:
-                     changes[fname]['deprecated'].append(key)
+        changes[fname]['added'] = sorted(curr_keys - prev_keys)
+        changes[fname]['removed'] = sorted(prev_keys - curr_keys)
+        
+        # Newly deprecated: present in both versions, deprecated only in the current one
+        prev_dep = {key for key, opt in prev_opts.items() if opt.get('deprecated', False)}
+        curr_dep = {key for key, opt in curr_opts.items() if opt.get('deprecated', False)}
+        changes[fname]['deprecated'] = sorted((curr_dep - prev_dep) & prev_keys)
                      
     return changes
 
@@ -131,46 +163,32 @@ def generate_html_page(changes, current_ver, prev_ver):
             continue
             
         has_changes = True
-        content_html.append(f'<div id="{doc}" class="doc-changes" style="margin-bottom: 40px;">')
-        content_html.append(f'<h3 style="border-bottom: 1px dashed var(--border-color); padding-bottom: 5px;">{doc}</h3>')
+        content_html.append(f'<div id="{doc}" class="doc-changes">')
+        content_html.append(f'<h3>{doc}</h3>')
         
         if doc_changes['added']:
-            content_html.append(f'<h4 class="added" style="color:var(--accent-color);">Added</h4><ul style="list-style-type: none; padding-left: 0;">')
-            
-            # Map doc name to HTML filename
-            html_map = {
-                "systemd.network": "systemd.network.html",
-                "systemd.netdev": "systemd.netdev.html",
-                "systemd.link": "systemd.link.html",
-                "systemd.networkd.conf": "networkd.conf.html"
-            }
-            target_file = html_map.get(doc, f"{doc}.html")
+            target_file = HTML_MAP.get(doc, f"{doc}.html")
             
+            items = []
             for item in doc_changes['added']:
                  # Item is Section.Option
                  # Display as [Section] - Option
-                 parts = item.split('.', 1)
+                 parts = html.escape(item).split('.', 1)
                  if len(parts) == 2:
-                     anchor = f"{parts[0]}-{parts[1]}"
-                     link = f"{target_file}#{anchor}"
-                     display_name = f"<code>[{parts[0]}] - {parts[1]}</code>"
-                     content_html.append(f'<li style="margin-bottom: 5px; padding-left: 20px; position: relative;"><span style="position: absolute; left: 0; color: var(--accent-color);">+</span> <a href="{link}">{display_name}</a></li>')
+                     link = f"{target_file}#{parts[0]}-{parts[1]}"
+                     items.append(f'<li class="change-item added"><span class="change-marker">+</span> <a href="{link}"><code>[{parts[0]}] - {parts[1]}</code></a></li>')
                  else:
-                     content_html.append(f'<li style="margin-bottom: 5px; padding-left: 20px; position: relative;"><span style="position: absolute; left: 0; color: var(--accent-color);">+</span> <code>{item}</code></li>')
+                     items.append(f'<li class="change-item added"><span class="change-marker">+</span> <code>{parts[0]}</code></li>')
                      
-            content_html.append('</ul>')
+            content_html.append(f'<h4 class="added">Added</h4><ul class="change-list">{"".join(items)}</ul>')
             
         if doc_changes['deprecated']:
-            content_html.append(f'<h4 class="deprecated" style="color:var(--warning-color);">Deprecated</h4><ul style="list-style-type: none; padding-left: 0;">')
-            for item in doc_changes['deprecated']:
-                 content_html.append(f'<li style="margin-bottom: 5px; padding-left: 20px; position: relative;"><span style="position: absolute; left: 0; color: var(--warning-color);">!</span> <code>{item}</code></li>')
-            content_html.append('</ul>')
+            items = "".join(f'<li class="change-item deprecated"><span class="change-marker">!</span> <code>{html.escape(item)}</code></li>' for item in doc_changes['deprecated'])
+            content_html.append(f'<h4 class="deprecated">Deprecated</h4><ul class="change-list">{items}</ul>')
             
         if doc_changes['removed']:
-            content_html.append(f'<h4 class="removed" style="color:#da3633;">Removed</h4><ul style="list-style-type: none; padding-left: 0;">')
-            for item in doc_changes['removed']:
-                 content_html.append(f'<li style="margin-bottom: 5px; padding-left: 20px; position: relative;"><span style="position: absolute; left: 0; color: #da3633;">-</span> <code>{item}</code></li>')
-            content_html.append('</ul>')
+            items = "".join(f'<li class="change-item removed"><span class="change-marker">-</span> <code>{html.escape(item)}</code></li>' for item in doc_changes['removed'])
+            content_html.append(f'<h4 class="removed">Removed</h4><ul class="change-list">{items}</ul>')
             
         content_html.append('</div>')
         
@@ -216,20 +234,20 @@ def main():
         return
 
     changes = compare_versions(prev_dir, curr_dir)
-    html = generate_html_page(changes, args.current, args.prev)
+    page = generate_html_page(changes, args.current, args.prev).encode('utf-8')
     
     write = True
     if not args.force and os.path.exists(args.output):
         try:
-           with open(args.output, 'r') as f:
-               if f.read() == html:
+           with open(args.output, 'rb') as f:
+               if f.read() == page:
                    write = False
                    print(f"Skipping {args.output} (unchanged)")
         except: pass
         
     if write:
-        with open(args.output, 'w') as f:
-            f.write(html)
+        with open(args.output, 'wb') as f:
+            f.write(page)
         print(f"Generated {args.output}")
 
 if __name__ == "__main__":
@@ -6,6 +6,13 @@ import argparse
 import html
 import xml.etree.ElementTree as ET
 import xml.etree.ElementInclude as ElementInclude
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # --- Constants ---
 
@@ -62,7 +69,100 @@ EXTERNAL_MAN_PAGES = {
     "udev": "https://man7.org/linux/man-pages/man7/udev.7.html"
 }
 
+# Rendered citerefentry links for known man pages; our own pages take precedence
+CITEREF_LINKS = {
+    **{title: f'<a href="{url}" target="_blank" class="external-link">{title}</a>' for title, url in EXTERNAL_MAN_PAGES.items()},
+    **{title: f'<a href="{title}.html">{title}</a>' for title in FILES},
+}
+
 NAMESPACE = {'xi': 'http://www.w3.org/2001/XInclude'}
+XI_INCLUDE = f"{{{NAMESPACE['xi']}}}include"
+
+# Bracketed section references in prose, e.g. "[DHCPServer]" (but not "Key=[...]")
+SECTION_REF_RE = re.compile(r'(?<!=)\[([A-Z][a-zA-Z0-9]+)\]')
+# Section name in a refsect1 title, e.g. "[Match] Section Options"
+SECTION_TITLE_RE = re.compile(r'\[(.*?)\]')
+# Redundant "Takes a boolean argument." style phrases, dropped from boolean option descriptions
+BOOLEAN_PHRASE_RE = re.compile(r'(?:Takes a|A) boolean(?: argument| value)?\.?\s*', re.IGNORECASE)
+# Markup stripped from descriptions for the search index
+HTML_TAG_RE = re.compile(r'<[^<]+?>')
+
+# DocBook tags rendered as a plain HTML wrapper around their content
+DOCBOOK_WRAPPERS = {
+    'para': ('<p>', '</p>'),
+    'title': ('<h4>', '</h4>'),
+    'filename': ('<code>', '</code>'),
+    'literal': ('<code>', '</code>'),
+    'command': ('<code class="command">', '</code>'),
+    'constant': ('<code class="constant">', '</code>'),
+    'programlisting': ('<pre><code>', '</code></pre>'),
+    'listitem': ('<li>', '</li>'),
+    'itemizedlist': ('<ul>', '</ul>'),
+    'variablelist': ('<dl>', '</dl>'),
+}
+# Tags whose content is code: no section-reference or attribute linking inside
+CODE_TAGS = frozenset(('programlisting', 'literal', 'filename', 'command', 'constant'))
+
+# Description of options that are in the schema but not in the man page
+UNDOCUMENTED_HTML = html.escape("This property exists within the code but has no published documentation.")
+
+# Types page groups, tried in order: a type lands in the first group with a keyword anywhere in its title
+TYPE_GROUP_PATTERNS = [
+    ("Base Data Types", re.compile('integer|duration|percent|bytes|rate|size|time')),
+    ("Networking", re.compile('ip|address|prefix|port|mac|endpoint|host|interface|vlan|mtu|duid|tunnel|multicast|label')),
+    ("Traffic Control", re.compile('qdisc|flow|nft|route|queue')),
+    ("System & Identifiers", re.compile('key|path|user|group|domain|glob|name|id')),
+]
+
+# Sort rank of x-category values; anything else sorts with expert
+CATEGORY_RANK = {'basic': 0, 'advanced': 1, 'expert': 2}
+
+# Option badge classes by x-category and by (lowercased) type label; other labels
+# containing "string" are strings, anything else is complex
+CATEGORY_BADGE_CLASSES = {
+    'basic': 'badge-category-basic',
+    'advanced': 'badge-category-advanced',
+    'expert': 'badge-category-expert'
+}
+TYPE_BADGE_CLASSES = {
+    'boolean': 'badge-type-boolean',
+    'integer': 'badge-type-integer',
+    'enum': 'badge-type-enum',
+    'filename': 'badge-type-string',
+    'path': 'badge-type-string'
+}
+
+
+def iter_descendants(elem, name):
+    """Yields descendants of elem named name in any (or no) namespace, like iterfind('.//{*}name')."""
+    suffix = '}' + name
+    for node in elem.iter():
+        if node is not elem and (node.tag == name or node.tag.endswith(suffix)):
+            yield node
+
+
+def replace_section_ref(match):
+    section_name = match.group(1)
+    return f'<a href="#section-{section_name}" class="section-ref">[{section_name}]</a>'
+
+def linkify_section_references(text):
+    """Converts bracketed section references like [DHCPServer] in escaped prose to links."""
+    return SECTION_REF_RE.sub(replace_section_ref, text)
+
+
+def option_sort_key(opt):
+    """Sorts options by category (basic, advanced, expert), then Required, other subcategories, General, then name."""
+    cat_rank = CATEGORY_RANK.get(opt.get('category', 'expert'), 2)
+    sc = opt['subcategory']
+    if sc == "Required": return (cat_rank, 0, opt['name'])
+    if sc == "General": return (cat_rank, 2, opt['name'])
+    return (cat_rank, 1, sc, opt['name'])
+
+
+def load_json(path):
+    with open(path, 'rb') as f:
+        raw = f.read()
+    return orjson.loads(raw) if orjson else json.loads(raw)
 
 
 class HtmlGenerator:
@@ -78,22 +178,6 @@ class HtmlGenerator:
         text = html.escape(elem.text or "")
         return text
 
-    def linkify_section_references(self, text, in_code_block=False):
-        """
-        Convert bracketed section references like [DHCPServer] to clickable links.
-        Only converts references outside of code blocks.
-        """
-        if in_code_block or not text:
-            return text
-
-        pattern = r'(?<!=)\[([A-Z][a-zA-Z0-9]+)\]'
-
-        def replace_ref(match):
-            section_name = match.group(1)
-            return f'<a href="#section-{section_name}" class="section-ref">[{section_name}]</a>'
-
-        return re.sub(pattern, replace_ref, text)
-
     def render_docbook_content(self, elem, context_version, in_code_block=False, attribute_map=None, current_option=None):
         """
         Recursively renders DocBook XML elements into HTML.
@@ -106,54 +190,42 @@ class HtmlGenerator:
         # Text before children
         if elem.text:
             escaped_text = html.escape(elem.text)
-            out.append(self.linkify_section_references(escaped_text, in_code_block))
+            if in_code_block or '[' not in escaped_text:
+                out.append(escaped_text)
+            else:
+                out.append(linkify_section_references(escaped_text))
 
         for child in elem:
-            tag = child.tag.split('}')[-1]  # Strip namespace
-
-            # Determine if this tag creates a code block context
-            is_code_tag = tag in ('programlisting', 'literal', 'filename', 'command', 'constant')
-            child_in_code = in_code_block or is_code_tag
-
-            content = self.render_docbook_content(child, context_version, child_in_code, attribute_map, current_option)
-
-            if tag == 'para':
-                out.append(f'<p>{content}</p>')
-            elif tag == 'title':
-                out.append(f'<h4>{content}</h4>')
-            elif tag == 'filename':
-                out.append(f'<code>{content}</code>')
-            elif tag == 'literal':
-                out.append(f'<code>{content}</code>')
-            elif tag == 'varname':
-                out.append(self._render_varname(content, in_code_block, attribute_map, current_option))
-            elif tag == 'command':
-                out.append(f'<code class="command">{content}</code>')
-            elif tag == 'constant':
-                out.append(f'<code class="constant">{content}</code>')
-            elif tag == 'programlisting':
-                out.append(f'<pre><code>{content}</code></pre>')
-            elif tag == 'listitem':
-                out.append(f'<li>{content}</li>')
-            elif tag == 'itemizedlist':
-                out.append(f'<ul>{content}</ul>')
-            elif tag == 'variablelist':
-                out.append(f'<dl>{content}</dl>')
+            tag = child.tag.rpartition('}')[2]  # Strip namespace
+
+            wrapper = DOCBOOK_WRAPPERS.get(tag)
+            if wrapper is not None:
+                # Code-like tags put their content in a code block context
+                child_in_code = in_code_block or tag in CODE_TAGS
+                content = self.render_docbook_content(child, context_version, child_in_code, attribute_map, current_option)
+                out.append(f'{wrapper[0]}{content}{wrapper[1]}')
             elif tag == 'varlistentry':
                 out.append(self._render_varlistentry(child, context_version, in_code_block, attribute_map, current_option))
-            elif tag == 'ulink':
-                out.append(self._render_ulink(child, content))
             elif tag == 'citerefentry':
                 out.append(self._render_citerefentry(child))
             elif tag == 'include':
                 pass  # Handled at higher level usually
             else:
-                out.append(f'<span class="docbook-{tag}">{content}</span>')
+                content = self.render_docbook_content(child, context_version, in_code_block, attribute_map, current_option)
+                if tag == 'varname':
+                    out.append(self._render_varname(content, in_code_block, attribute_map, current_option))
+                elif tag == 'ulink':
+                    out.append(self._render_ulink(child, content))
+                else:
+                    out.append(f'<span class="docbook-{tag}">{content}</span>')
 
             # Append tail text
             if child.tail:
                 escaped_tail = html.escape(child.tail)
-                out.append(self.linkify_section_references(escaped_tail, in_code_block))
+                if in_code_block or '[' not in escaped_tail:
+                    out.append(escaped_tail)
+                else:
+                    out.append(linkify_section_references(escaped_tail))
 
         return "".join(out)
 
@@ -192,12 +264,10 @@ class HtmlGenerator:
 
         ref_title = title_elem.text if title_elem is not None else "Unknown"
 
-        if ref_title in FILES:
-            return f'<a href="{ref_title}.html">{ref_title}</a>'
-        elif ref_title in EXTERNAL_MAN_PAGES:
-            return f'<a href="{EXTERNAL_MAN_PAGES[ref_title]}" target="_blank" class="external-link">{ref_title}</a>'
-        else:
-            return f'<a href="https://www.freedesktop.org/software/systemd/man/latest/{ref_title}.html" target="_blank" class="external-link">{ref_title}</a>'
+        link = CITEREF_LINKS.get(ref_title)
+        if link is None:
+            link = f'<a href="https://www.freedesktop.org/software/systemd/man/latest/{ref_title}.html" target="_blank" class="external-link">{ref_title}</a>'
+        return link
 
     def generate_sidebar(self, title_html, nav_items, links_html=None, version_selector_html=None):
         if links_html is None:
@@ -304,7 +374,14 @@ class PageGenerator(HtmlGenerator):
         self.schema_dir = schema_dir
         self.web_schemas = web_schemas
         self.schema = None
+        self.ref_cache = {}
+        # allOf/$ref chains keyed by id() of the schema dicts; only valid for the current self.schema
+        self.chain_cache = {}
         self.attribute_map = {}
+        # Parsed (and include-expanded) xi:include targets, shared by all pages of this version,
+        # and each target's elements by id for xpointer lookups
+        self.include_cache = {}
+        self.include_ids = {}
 
     def extract_introduction(self, root):
         """Extracts the 'Description' section content as HTML."""
@@ -335,7 +412,7 @@ class PageGenerator(HtmlGenerator):
         section_intros = {}
         
         def process_node(node, current_section=None):
-            tag = node.tag.split('}')[-1]
+            tag = node.tag.rpartition('}')[2]
             
             if tag == 'refsect1':
                 title = node.find("{*}title")
@@ -343,7 +420,7 @@ class PageGenerator(HtmlGenerator):
                 
                 if title is not None:
                     title_text = "".join(title.itertext()).strip()
-                    match = re.search(r'\[(.*?)\]', title_text)
+                    match = SECTION_TITLE_RE.search(title_text)
                     if match:
                         current_section = match.group(1)
                         if current_section not in sections:
@@ -365,33 +442,26 @@ class PageGenerator(HtmlGenerator):
         process_node(root_element)
         return sections, section_intros
 
-    def get_option_name(self, varlistentry):
-        """Get the first option name from a varlistentry."""
-        term = varlistentry.find(".//{*}term")
-        if term is None: return None
-        raw = "".join(term.itertext()).strip()
-        return raw.split('=')[0].strip()
-
     def get_all_option_names(self, varlistentry):
         """Get all option names from a varlistentry (handles multi-term entries)."""
-        terms = varlistentry.findall(".//{*}term")
+        return [name for name in self._get_term_names(varlistentry) if name]
+
+    def _get_term_names(self, varlistentry):
+        """Option name of every term in a varlistentry, in order ('' for terms without one)."""
         names = []
-        for term in terms:
+        for term in iter_descendants(varlistentry, 'term'):
             raw = "".join(term.itertext()).strip()
-            name = raw.split('=')[0].strip()
-            if name:
-                names.append(name)
+            names.append(raw.split('=')[0].strip())
         return names
 
     def get_description(self, varlistentry, attribute_map=None, current_option=None):
-        listitem = varlistentry.find(".//{*}listitem")
+        listitem = next(iter_descendants(varlistentry, 'listitem'), None)
         if listitem is None: return ""
         return self.render_docbook_content(listitem, self.version, in_code_block=False, attribute_map=attribute_map, current_option=current_option)
 
     def get_version_added(self, varlistentry):
-        ns = NAMESPACE
-        includes = varlistentry.findall(".//xi:include", ns)
-        for inc in includes:
+        # iter() walks the subtree in C; cheaper than an ElementPath ".//xi:include" per option
+        for inc in varlistentry.iter(XI_INCLUDE):
             if "version-info.xml" in inc.get('href', ''):
                 xp = inc.get('xpointer', '') 
                 if xp.startswith('v'):
@@ -400,9 +470,13 @@ class PageGenerator(HtmlGenerator):
 
     def resolve_ref(self, s):
         if '$ref' in s:
-            ref_name = s['$ref'].split('/')[-1]
+            ref = s['$ref']
+            if ref in self.ref_cache:
+                return self.ref_cache[ref]
+            ref_name = ref.split('/')[-1]
             if ref_name in self.schema.get('definitions', {}):
-                return self.resolve_ref(self.schema['definitions'][ref_name])
+                resolved = self.ref_cache[ref] = self.resolve_ref(self.schema['definitions'][ref_name])
+                return resolved
         return s
 
     def calculate_type_label(self, s, depth=0):
@@ -425,11 +499,8 @@ class PageGenerator(HtmlGenerator):
         elif 'anyOf' in s: variants = s['anyOf']
         
         if variants:
-            labels = []
-            for v in variants:
-                lbl = self.calculate_type_label(v, depth+1)
-                if lbl and lbl not in labels:
-                    labels.append(lbl)
+            labels = {self.calculate_type_label(v, depth+1) for v in variants}
+            labels.discard("")
             if labels:
                 return " | ".join(sorted(labels))
         
@@ -445,14 +516,24 @@ class PageGenerator(HtmlGenerator):
         if t: return t
         return "string" 
 
-    def get_deep_prop(self, s, key):
-        if key in s: return s[key]
-        if 'allOf' in s and len(s['allOf']) > 0: return self.get_deep_prop(s['allOf'][0], key)
-        if '$ref' in s:
-            ref = s['$ref'].split('/')[-1]
-            if ref in self.schema['definitions']:
-                return self.get_deep_prop(self.schema['definitions'][ref], key)
-        return None
+    def resolve_chain(self, s):
+        """Returns s followed by every schema reached through allOf[0] and $ref."""
+        chain = self.chain_cache.get(id(s))
+        if chain is not None:
+            return chain
+        definitions = self.schema.get('definitions', {})
+        chain = (s,)
+        if s.get('allOf'):
+            chain += self.resolve_chain(s['allOf'][0])
+        elif '$ref' in s:
+            ref_name = s['$ref'].split('/')[-1]
+            if ref_name in definitions:
+                chain += self.resolve_chain(definitions[ref_name])
+        self.chain_cache[id(s)] = chain
+        return chain
+
+    def resolve_all(self, s):
+        return self.resolve_chain(s)[-1]
         
     def check_is_multiple(self, s, depth=0):
          if depth > 3: return False
@@ -507,31 +588,32 @@ class PageGenerator(HtmlGenerator):
 
         print(f"Processing {doc_name}...")
 
-        with open(schema_file, 'r') as f:
-            self.schema = json.load(f)
+        self.schema = load_json(schema_file)
+        self.ref_cache = {}
+        self.chain_cache = {}
 
         tree = ET.parse(xml_file)
         root = tree.getroot()
 
         # Process XIncludes manually to handle xpointer properly
-        # Cache parsed include files to avoid re-parsing
-        include_cache = {}
+        # Cache parsed include files to avoid re-parsing (across pages too, e.g. version-info.xml)
+        include_cache = self.include_cache
+        include_ids = self.include_ids
 
         def process_xincludes(elem, processing_stack=None):
             """Process xi:include elements, handling xpointer ID references."""
             if processing_stack is None:
                 processing_stack = set()
 
-            xi_ns = "{http://www.w3.org/2001/XInclude}"
             to_replace = []
 
             for i, child in enumerate(elem):
-                if child.tag == f"{xi_ns}include":
+                if child.tag == XI_INCLUDE:
                     href = child.get("href")
                     xpointer = child.get("xpointer")
                     if href:
                         full_path = os.path.join(self.src_dir, href)
-                        if os.path.exists(full_path):
+                        if full_path in include_cache or os.path.exists(full_path):
                             try:
                                 # Use cached tree or parse new one
                                 if full_path not in include_cache:
@@ -545,12 +627,20 @@ class PageGenerator(HtmlGenerator):
                                         processing_stack.discard(full_path)
                                     include_cache[full_path] = inc_root
 
+                                    # Index descendants by id once (first in document order wins, like find)
+                                    ids = include_ids[full_path] = {}
+                                    for top in inc_root:
+                                        for node in top.iter():
+                                            node_id = node.get('id')
+                                            if node_id is not None and node_id not in ids:
+                                                ids[node_id] = node
+
                                 inc_root = include_cache[full_path]
 
                                 if xpointer:
                                     # Find element by ID - need to make a deep copy to avoid issues
                                     # when the same element is included multiple times
-                                    found = inc_root.find(f".//*[@id='{xpointer}']")
+                                    found = include_ids[full_path].get(xpointer)
                                     if found is not None:
                                         found_copy = copy.deepcopy(found)
                                         to_replace.append((i, child, found_copy))
@@ -574,12 +664,17 @@ class PageGenerator(HtmlGenerator):
         sections_xml, section_intros = self.flatten_sections(root)
 
         # Build Attribute Map
+        # Section properties and entry option names are kept for _process_options below
         self.attribute_map = {}
+        section_props = {}
+        entry_names = {}
         for section_name, entries in sections_xml.items():
             if section_name not in self.schema['properties']: continue
-            props = self._get_effective_properties(self.schema['properties'][section_name])
+            props = section_props[section_name] = self._get_effective_properties(self.schema['properties'][section_name])
             for entry in entries:
-                name = self.get_option_name(entry)
+                term_names = self._get_term_names(entry)
+                entry_names[entry] = [n for n in term_names if n]
+                name = term_names[0] if term_names else None
                 if name and name in props:
                     self.attribute_map[name] = f"{section_name}-{name}"
 
@@ -613,18 +708,17 @@ class PageGenerator(HtmlGenerator):
 
         # Sort sections by category (basic=0, advanced=1, expert=2), preserving docbook order within category
         sections_list = [(name, entries, idx) for idx, (name, entries) in enumerate(sections_xml.items()) if name in self.schema['properties']]
+        section_categories = {name: get_section_category(name) for name, entries, idx in sections_list}
 
         def section_sort_key(item):
             section_name, entries, original_idx = item
-            cat = get_section_category(section_name)
-            cat_order = {'basic': 0, 'advanced': 1, 'expert': 2}.get(cat, 2)
-            return (cat_order, original_idx)
+            return (CATEGORY_RANK.get(section_categories[section_name], 2), original_idx)
 
         sorted_sections = [(name, entries) for name, entries, idx in sorted(sections_list, key=section_sort_key)]
 
         for section_name, entries in sorted_sections:
             section_id = f"section-{section_name}"
-            section_category = get_section_category(section_name)
+            section_category = section_categories[section_name]
 
             section_cat_class = f"sidebar-cat-{section_category}"
             section_cat_indicator = f'<span class="sidebar-category-indicator {section_cat_class}">{section_category}</span>'
@@ -647,17 +741,9 @@ class PageGenerator(HtmlGenerator):
                 html_blocks.append('</div>')
 
             # Render Options
-            options_data = self._process_options(section_name, entries)
-
-            # Sorting: category (basic=0, advanced=1, expert=2), then subcategory, then name
-            def sort_key(item):
-                cat = item.get('category', 'expert')
-                cat_order = {'basic': 0, 'advanced': 1, 'expert': 2}.get(cat, 2)
-                sc = item['subcategory']
-                if sc == "Required": return (cat_order, 0, item['name'])
-                if sc == "General": return (cat_order, 2, item['name'])
-                return (cat_order, 1, sc, item['name'])
-            options_data.sort(key=sort_key)
+            options_data = self._process_options(section_name, entries, section_props[section_name], entry_names)
+
+            options_data.sort(key=option_sort_key)
 
             # Group options by category for sidebar
             category_order = ['basic', 'advanced', 'expert']
@@ -692,7 +778,7 @@ class PageGenerator(HtmlGenerator):
                     'section': opt['subcategory'],
                     'file': f"{doc_name}.html",
                     'anchor': f"#{anchor_id}",
-                    'desc': re.sub('<[^<]+?>', '', opt['desc_html'])[:150]
+                    'desc': opt['desc_snippet']
                 })
 
             html_blocks.append('</div>')
@@ -702,7 +788,7 @@ class PageGenerator(HtmlGenerator):
         version_selector = self._generate_version_selector(available_versions, doc_name)
         
         changes_link = ""
-        if available_versions and self.version != sorted(list(available_versions))[0] and self.version != "latest":
+        if available_versions and self.version != min(available_versions) and self.version != "latest":
              changes_link = '&middot; <a href="changes.html">Changes</a>'
 
         sidebar = self.generate_sidebar(
@@ -720,19 +806,21 @@ class PageGenerator(HtmlGenerator):
         )
         
         out_path = os.path.join(self.output_dir, f"{doc_name}.html")
+        page = full_html.encode('utf-8')
         
         write = True
-        if not force and os.path.exists(out_path):
+        # A size mismatch means the page changed without reading the old file back
+        if not force and os.path.exists(out_path) and os.path.getsize(out_path) == len(page):
              try:
-                with open(out_path, 'r') as f:
-                    if f.read() == full_html:
+                with open(out_path, 'rb') as f:
+                    if f.read() == page:
                         write = False
                         print(f" -> Skipping {doc_name}.html (unchanged)")
              except: pass
         
         if write:
-            with open(out_path, 'w') as f:
-                f.write(full_html)
+            with open(out_path, 'wb') as f:
+                f.write(page)
             print(f" -> Generated {doc_name}.html")
 
         return searchable_items
@@ -741,31 +829,32 @@ class PageGenerator(HtmlGenerator):
         if not available_versions:
             return f'<p style="color:var(--meta-color); font-size:0.8em; margin-bottom:20px;">Version {self.version}</p>'
         
-        versions = list(available_versions)
-        if 'latest' in versions: versions.remove('latest')
-        versions.sort(reverse=True)
+        versions = sorted((v for v in available_versions if v != 'latest'), reverse=True)
         if 'latest' in available_versions: versions.insert(0, 'latest')
 
-        opts = ""
-        for v in versions:
-            selected = 'selected' if v == self.version else ''
-            opts += f'<option value="../{v}/{doc_name}.html" {selected}>{v}</option>'
+        opts = "".join([
+            f'<option value="../{v}/{doc_name}.html" {"selected" if v == self.version else ""}>{v}</option>'
+            for v in versions
+        ])
         return f'<select class="version-selector" onchange="window.location.href=this.value;">{opts}</select>'
 
-    def _process_options(self, section_name, entries):
+    def _process_options(self, section_name, entries, props_schema_map=None, entry_names=None):
         options_data = []
         processed_options = set()
 
-        props_schema_map = self._get_effective_properties(self.schema['properties'][section_name])
+        if props_schema_map is None:
+            props_schema_map = self._get_effective_properties(self.schema['properties'][section_name])
 
         # Build a map from option names to XML entries (handles multi-term varlistentries)
         name_to_entry = {}
         for entry in entries:
-            names = self.get_all_option_names(entry)
+            names = entry_names[entry] if entry_names else self.get_all_option_names(entry)
             for name in names:
                 if name not in name_to_entry:
                     name_to_entry[name] = entry
 
+        required = frozenset(self.schema['properties'][section_name].get('required', ()))
+
         # Process all schema properties, using XML entry if available
         for name, prop_schema in props_schema_map.items():
             if name in processed_options: continue
@@ -773,42 +862,41 @@ class PageGenerator(HtmlGenerator):
 
             processed_options.add(name)
             xml_entry = name_to_entry.get(name)  # May be None for truly undocumented
-            data = self._extract_option_data(name, section_name, prop_schema, xml_entry)
+            data = self._extract_option_data(name, section_name, prop_schema, xml_entry, required)
             options_data.append(data)
 
         return options_data
 
-    def _extract_option_data(self, name, section_name, prop_schema, xml_entry):
-        def resolve_all(s):
-            if 'allOf' in s: return resolve_all(s['allOf'][0])
-            if '$ref' in s:
-                ref = s['$ref'].split('/')[-1]
-                if ref in self.schema['definitions']:
-                    return resolve_all(self.schema['definitions'][ref])
-            return s
-
-        res_schema = resolve_all(prop_schema)
+    def _extract_option_data(self, name, section_name, prop_schema, xml_entry, required=None):
+        chain = self.resolve_chain(prop_schema)
+        res_schema = chain[-1]
+        # Flattened view of the allOf/$ref chain; the first schema setting a key wins
+        deep = {}
+        for s in reversed(chain):
+            deep.update(s)
 
         value_type = self.calculate_type_label(prop_schema)
         is_multiple = self.check_is_multiple(prop_schema)
-        is_mandatory = name in self.schema['properties'][section_name].get('required', [])
+        if required is None:
+            required = self.schema['properties'][section_name].get('required', [])
+        is_mandatory = name in required
 
         default_val = res_schema.get('default')
         if default_val is None:
-            default_val = self.get_deep_prop(prop_schema, 'default')
+            default_val = deep.get('default')
 
-        subcategory = self.get_deep_prop(prop_schema, 'x-subcategory') or "General"
+        subcategory = deep.get('x-subcategory') or "General"
         if is_mandatory: subcategory = "Required"
 
         # Get x-category (basic, advanced, or expert if not set)
-        category = prop_schema.get('x-category') or self.get_deep_prop(prop_schema, 'x-category') or "expert"
+        category = deep.get('x-category') or "expert"
 
         version_added = prop_schema.get('version_added')
         
         # Examples
         examples = prop_schema.get('examples') or res_schema.get('examples', [])
         if not examples and res_schema.get('type') == 'array' and 'items' in res_schema:
-             items_schema = resolve_all(res_schema['items'])
+             items_schema = self.resolve_all(res_schema['items'])
              examples = items_schema.get('examples', [])
         
         # Description
@@ -819,28 +907,17 @@ class PageGenerator(HtmlGenerator):
                 
             # Clean Boolean Description
             if value_type == 'boolean' and 'oneOf' not in res_schema:
-                 patterns = [
-                    r'Takes a boolean argument\.?\s*',
-                    r'Takes a boolean value\.?\s*',
-                    r'Takes a boolean\.?\s*',
-                    r'A boolean argument\.?\s*',
-                    r'A boolean value\.?\s*',
-                    r'A boolean\.?\s*'
-                ]
-                 for pat in patterns:
-                    desc_html = re.sub(pat, '', desc_html, flags=re.IGNORECASE)
+                 desc_html = BOOLEAN_PHRASE_RE.sub('', desc_html)
+            # Plain-text start of the description for the search index
+            desc_snippet = HTML_TAG_RE.sub('', desc_html)[:150]
         else:
-             desc_text = prop_schema.get('description') or res_schema.get('description') or "This property exists within the code but has no published documentation."
-             desc_html = html.escape(desc_text)
+             desc_text = prop_schema.get('description') or res_schema.get('description')
+             desc_html = html.escape(desc_text) if desc_text else UNDOCUMENTED_HTML
+             desc_snippet = desc_html[:150]
 
         # Type Slug
         type_slug = value_type
-        def find_ref(s):
-            if '$ref' in s: return s['$ref']
-            if 'allOf' in s and len(s['allOf']) > 0: return find_ref(s['allOf'][0])
-            return None
-        
-        ref_str = find_ref(prop_schema)
+        ref_str = deep.get('$ref')
         if ref_str:
              ref_name = ref_str.split('/')[-1]
              if ref_name in self.schema.get('definitions', {}):
@@ -876,8 +953,8 @@ class PageGenerator(HtmlGenerator):
         # Actually, let's just make it empty if we can't determine it easily, or use a Safe default.
         
         # Check for deprecated alias metadata
-        deprecated_alias = prop_schema.get('x-deprecated-alias') or self.get_deep_prop(prop_schema, 'x-deprecated-alias')
-        is_deprecated = prop_schema.get('x-deprecated') or self.get_deep_prop(prop_schema, 'x-deprecated') or False
+        deprecated_alias = deep.get('x-deprecated-alias')
+        is_deprecated = deep.get('x-deprecated') or False
 
         return {
             'name': name,
@@ -887,6 +964,7 @@ class PageGenerator(HtmlGenerator):
             'type': value_type,
             'type_slug': type_slug,
             'desc_html': desc_html,
+            'desc_snippet': desc_snippet,
             'required': is_mandatory,
             'default': default_val,
             'examples': examples,
@@ -900,36 +978,25 @@ class PageGenerator(HtmlGenerator):
     def _render_option_html(self, opt, anchor_id):
         name = opt['name']
 
-        # Meta Badges
-        badges = []
-
-        # Category badge
+        # Meta Badges: category, version, required
         category = opt.get('category', 'expert')
-        cat_classes = {
-            'basic': 'badge-category-basic',
-            'advanced': 'badge-category-advanced',
-            'expert': 'badge-category-expert'
-        }
-        cat_class = cat_classes.get(category, 'badge-category-expert')
-        badges.append(f'<span class="badge {cat_class}">{category.title()}</span>')
+        cat_class = CATEGORY_BADGE_CLASSES.get(category, 'badge-category-expert')
+        meta_html = f'<span class="badge {cat_class}">{category.title()}</span>'
 
         if opt.get('version_added'):
-             badges.append(f'<span class="badge badge-version">v{opt["version_added"]}+</span>')
+             meta_html += f'<span class="badge badge-version">v{opt["version_added"]}+</span>'
 
         if opt['required']:
-            badges.append(f'<span class="badge badge-required">Required</span>')
+            meta_html += '<span class="badge badge-required">Required</span>'
         else:
-            badges.append(f'<span class="badge badge-default">Optional</span>')
-
-        meta_html = "".join(badges)
+            meta_html += '<span class="badge badge-default">Optional</span>'
         
         # Type Badge
         t_raw = opt['type']
-        t_cls = "badge-type-complex"
-        if t_raw.lower() == "boolean": t_cls = "badge-type-boolean"
-        elif t_raw.lower() == "integer": t_cls = "badge-type-integer"
-        elif t_raw.lower() == "enum": t_cls = "badge-type-enum"
-        elif "string" in t_raw.lower() or t_raw.lower() in ["filename", "path"]: t_cls = "badge-type-string"
+        t_lower = t_raw.lower()
+        t_cls = TYPE_BADGE_CLASSES.get(t_lower)
+        if t_cls is None:
+            t_cls = "badge-type-string" if "string" in t_lower else "badge-type-complex"
         
         type_badge = f'<a href="../types.html#{opt["type_slug"]}" class="badge badge-type-prominent {t_cls}">{t_raw}</a>'
         
@@ -967,8 +1034,7 @@ class PageGenerator(HtmlGenerator):
 
         examples_html = ""
         if opt['examples']:
-            ex_lines = [f"{name}={ex}" for ex in opt['examples']]
-            ex_content = "\n".join(ex_lines)
+            ex_content = "\n".join([f"{name}={ex}" for ex in opt['examples']])
             examples_html = f'<div class="option-examples" style="margin-top:10px;"><strong>Examples:</strong><pre><code>{ex_content}</code></pre></div>'
 
         return f'''
@@ -999,8 +1065,7 @@ class TypesGenerator(HtmlGenerator):
             print(f"Warning: Schema file not found for types generation: {schema_file}")
             return
 
-        with open(schema_file, 'r') as f:
-            schema = json.load(f)
+        schema = load_json(schema_file)
             
         definitions = schema.get('definitions', {})
         definitions = {k: v for k, v in definitions.items() if k.endswith('Type')}
@@ -1020,6 +1085,7 @@ class TypesGenerator(HtmlGenerator):
         html_blocks = []
         nav_items = []
         
+        described = {}
         group_order = ["Common Types", "Base Data Types", "Networking", "System & Identifiers", "Traffic Control", "Other"]
         
         for cat in group_order:
@@ -1035,7 +1101,7 @@ class TypesGenerator(HtmlGenerator):
                 
                 desc = type_def.get('description', 'No description available.')
                 
-                type_desc_str = self._describe_type_structure(type_def, definitions)
+                type_desc_str = self._describe_type_structure(type_def, definitions, described)
                 
                 html_blocks.append(f'''
                 <div id="{type_name}" class="option-block" style="margin-bottom: 20px;">
@@ -1077,41 +1143,43 @@ class TypesGenerator(HtmlGenerator):
         sorted_items = sorted(all_types.items(), key=lambda item: item[1].get('title', item[0]).lower())
         
         for key, val in sorted_items:
-            title = val.get('title', key).lower()
-            cat = "Other"
-            
-            if key in ["string", "boolean", "integer", "enum"]: cat = "Common Types"
-            elif any(x in title for x in ['integer', 'duration', 'percent', 'bytes', 'rate', 'size', 'time']) or key.startswith('uint'): cat = "Base Data Types"
-            elif any(x in title for x in ['ip', 'address', 'prefix', 'port', 'mac', 'endpoint', 'host', 'interface', 'vlan', 'mtu', 'duid', 'tunnel', 'multicast', 'label']): cat = "Networking"
-            elif any(x in title for x in ['qdisc', 'flow', 'nft', 'route', 'queue']): cat = "Traffic Control"
-            elif any(x in title for x in ['key', 'path', 'user', 'group', 'domain', 'glob', 'name', 'id']): cat = "System & Identifiers"
+            if key in ("string", "boolean", "integer", "enum"): cat = "Common Types"
+            elif key.startswith('uint'): cat = "Base Data Types"
+            else:
+                title = val.get('title', key).lower()
+                cat = next((group for group, pattern in TYPE_GROUP_PATTERNS if pattern.search(title)), "Other")
             
             groups[cat].append((key, val))
             
         return {k: v for k, v in groups.items() if v}
 
-    def _describe_type_structure(self, s, definitions):
+    def _describe_type_structure(self, s, definitions, memo=None):
+        # memo maps definition names to their description, so a shared untitled
+        # definition is only described once per types page
+        if memo is None: memo = {}
         constraints = []
         
         if '$ref' in s:
             ref_name = s['$ref'].split('/')[-1]
+            if ref_name in memo: return memo[ref_name]
             if ref_name in definitions:
                  target = definitions[ref_name]
                  if 'title' in target: return target['title']
-                 return self._describe_type_structure(target, definitions)
+                 memo[ref_name] = self._describe_type_structure(target, definitions, memo)
+                 return memo[ref_name]
             return ref_name
         
         if 'oneOf' in s:
-            sub = [self._describe_type_structure(x, definitions) for x in s['oneOf']]
-            return " OR ".join(sorted(list(set(sub))))
+            sub = [self._describe_type_structure(x, definitions, memo) for x in s['oneOf']]
+            return " OR ".join(sorted(set(sub)))
             
         if 'anyOf' in s:
-            sub = [self._describe_type_structure(x, definitions) for x in s['anyOf']]
-            return " OR ".join(sorted(list(set(sub))))
+            sub = [self._describe_type_structure(x, definitions, memo) for x in s['anyOf']]
+            return " OR ".join(sorted(set(sub)))
         
         if 'allOf' in s:
             # For allOf, we might have multiple constraints. 
-            sub = [self._describe_type_structure(x, definitions) for x in s['allOf']]
+            sub = [self._describe_type_structure(x, definitions, memo) for x in s['allOf']]
             return " AND ".join([x for x in sub if x != "Complex Type"]) # Filter generic?
 
         if 'const' in s:
@@ -1314,6 +1382,37 @@ def generate_index(output_dir, version):
         f.write(html)
 
 
+# PageGenerator of this process, built once per pool worker so that its include
+# caches are shared by every document the worker renders
+page_generator = None
+
+def init_page_generator(*generator_args):
+    global page_generator
+    page_generator = PageGenerator(*generator_args)
+
+def generate_doc(doc, available_versions, force):
+    try:
+        return page_generator.generate(doc, available_versions, force)
+    except Exception as e:
+        print(f"Error processing {doc}: {e}")
+        import traceback
+        traceback.print_exc()
+        return []
+
+def generate_pages(generator_args, available_versions=None, force=False, workers=1):
+    """Renders every document in FILES and returns their search index entries in FILES order."""
+    jobs = (FILES, repeat(available_versions), repeat(force))
+    search_index = []
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_page_generator, initargs=generator_args) as executor:
+            for items in executor.map(generate_doc, *jobs):
+                search_index.extend(items)
+    else:
+        init_page_generator(*generator_args)
+        for items in map(generate_doc, *jobs):
+            search_index.extend(items)
+    return search_index
+
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--version", required=True, help="e.g. v257")
@@ -1337,16 +1436,9 @@ def main():
     os.makedirs(output_dir, exist_ok=True)
     
     if args.mode == 'pages':
-        generator = PageGenerator(output_dir, args.version, src_dir, schema_dir, args.web_schemas)
-        search_index = []
-        for doc in FILES:
-            try:
-                items = generator.generate(doc, args.available_versions, args.force)
-                search_index.extend(items)
-            except Exception as e:
-                print(f"Error processing {doc}: {e}")
-                import traceback
-                traceback.print_exc()
+        generator_args = (output_dir, args.version, src_dir, schema_dir, args.web_schemas)
+        workers = min(len(FILES), os.cpu_count() or 1)
+        search_index = generate_pages(generator_args, args.available_versions, args.force, workers)
         
         with open(os.path.join(output_dir, "search_index.json"), "w") as f:
             json.dump(search_index, f, indent=None)
@@ -34,6 +34,12 @@ FORCE_LIST_ITEMS = {
     ("Network", "Bridge"),
 }
 
+# Words the man pages use for boolean defaults ("Defaults to yes.")
+TRUE_WORDS = {"yes", "true", "on", "enabled", "1"}
+FALSE_WORDS = {"no", "false", "off", "disabled", "0"}
+# "Defaults to unset." and the like name no actual default value
+NO_DEFAULT_WORDS = {"unset", "empty", "none", "n/a", "ignored"}
+
 # --- 2. Shared Schema Definitions ---
 SCHEMA_DEFINITIONS = {
     "mac_address": {
@@ -130,7 +136,7 @@ def get_text_with_semantics(elem):
     for child in elem:
         child_text = get_text_with_semantics(child)
         tag = child.tag.split('}')[-1]
-        if tag in ['literal', 'constant', 'option', 'filename']:
+        if tag in {'literal', 'constant', 'option', 'filename'}:
             if not (child_text.startswith("'") or child_text.startswith('"')):
                 out.append(f"'{child_text}'")
             else:
@@ -200,14 +206,15 @@ def extract_default_value(text, schema_type):
         match = re.search(p, text)
         if match:
             candidate = match.group(1).rstrip('.').strip()
-            if candidate.lower() not in ['unset', 'empty', 'none', 'n/a', 'ignored']:
+            if candidate.lower() not in NO_DEFAULT_WORDS:
                 val_str = candidate
             break
     if val_str is None: return None
 
     if schema_type == 'boolean':
-        if val_str.lower() in ['yes', 'true', 'on', 'enabled', '1']: return True
-        if val_str.lower() in ['no', 'false', 'off', 'disabled', '0']: return False
+        lowered = val_str.lower()
+        if lowered in TRUE_WORDS: return True
+        if lowered in FALSE_WORDS: return False
         return None
     elif schema_type == 'integer':
         if val_str.isdigit(): return int(val_str)
@@ -1,5 +1,6 @@
 import sys
 import os
+import json
 import pytest
 
 # Allow importing from bin/
@@ -15,6 +16,47 @@ class TestChangelogGeneration:
         # or just mock load_schema?
         pass
         
+    def test_compare_versions_sorted_changes(self, tmp_path):
+        def write(ver, opts):
+            d = tmp_path / ver
+            d.mkdir()
+            schema = {"properties": {"Match": {"properties": opts}}}
+            (d / "systemd.network.schema.json").write_text(json.dumps(schema))
+            return str(d)
+
+        prev = write("v1", {"Old": {}, "Zed": {}, "Keep": {}, "Bar": {}})
+        curr = write("v2", {"Zed": {"deprecated": True}, "New": {"deprecated": True}, "Keep": {},
+                            "Bar": {"deprecated": True}, "Add": {}})
+        changes = generate_changelog.compare_versions(prev, curr)
+        assert list(changes) == ["systemd.network"]
+        assert changes["systemd.network"] == {
+            "added": ["Match.Add", "Match.New"],
+            "removed": ["Match.Old"],
+            "deprecated": ["Match.Bar", "Match.Zed"],
+        }
+
+    def test_compare_versions_one_sided_doc(self, tmp_path):
+        prev = tmp_path / "v1"
+        curr = tmp_path / "v2"
+        prev.mkdir()
+        curr.mkdir()
+        schema = {"properties": {"Link": {"properties": {"B": {}, "A": {"deprecated": True}}}}}
+        (curr / "systemd.link.schema.json").write_text(json.dumps(schema))
+        (prev / "systemd.netdev.schema.json").write_text(json.dumps(schema))
+
+        changes = generate_changelog.compare_versions(str(prev), str(curr))
+        assert changes == {
+            "systemd.netdev": {"added": [], "removed": ["Link.A", "Link.B"], "deprecated": []},
+            "systemd.link": {"added": ["Link.A", "Link.B"], "removed": [], "deprecated": []},
+        }
+
+    def test_load_options_missing_or_empty(self, tmp_path):
+        (tmp_path / "systemd.network.schema.json").write_text(json.dumps({}))
+        (tmp_path / "systemd.link.schema.json").write_text(json.dumps({"properties": {"Match": {"properties": {"Name": {}}}}}))
+        assert generate_changelog.load_options(str(tmp_path), "systemd.netdev") is None
+        assert generate_changelog.load_options(str(tmp_path), "systemd.network") is None
+        assert list(generate_changelog.load_options(str(tmp_path), "systemd.link")) == ["Match.Name"]
+
     def test_flatten_properties(self):
         schema = {
             "properties": {
@@ -46,6 +88,29 @@ class TestChangelogGeneration:
         flat = generate_changelog.flatten_properties(schema)
         assert "Match.Name" in flat
 
+    def test_flatten_properties_ref_chain_and_cycle(self):
+        schema = {
+            "definitions": {
+                "A": {"$ref": "#/definitions/B"},
+                "B": {"type": "string"},
+                "Loop1": {"$ref": "#/definitions/Loop2"},
+                "Loop2": {"$ref": "#/definitions/Loop1"}
+            },
+            "properties": {
+                "Match": {
+                    "properties": {
+                        "Name": {"$ref": "#/definitions/A"},
+                        "Other": {"$ref": "#/definitions/B"},
+                        "Cyclic": {"$ref": "#/definitions/Loop1"}
+                    }
+                }
+            }
+        }
+        flat = generate_changelog.flatten_properties(schema)
+        assert flat["Match.Name"] == {"type": "string"}
+        assert flat["Match.Other"] == {"type": "string"}
+        assert "$ref" in flat["Match.Cyclic"]
+
     def test_flatten_properties_oneof(self):
         schema = {
             "properties": {
@@ -31,11 +31,13 @@ class TestSchemaDerivation:
         
         diff = derive_schema_version.deep_diff_structure(base, target)
         
-        # The return structure when modifying existing key is diff["add"][key] = sub_diff["add"]
-        # So diff["add"]["Sec"] is the dictionary of added properties to 'Sec'.
+        # The return structure when modifying existing key is diff["add"][key] = {NESTED: sub_diff["add"]}
+        # So diff["add"]["Sec"][NESTED] is the dictionary of added properties to 'Sec'.
         
         assert "Sec" in diff["add"]
-        assert "B" in diff["add"]["Sec"]
+        assert "B" in diff["add"]["Sec"][derive_schema_version.NESTED]
+        # Nothing was removed inside Sec, so no empty removal entry is recorded
+        assert "Sec" not in diff["remove"]
         
     def test_deep_diff_unwrap_oneof(self):
         # Target has wrapped oneOf (common in generated)
@@ -53,7 +55,7 @@ class TestSchemaDerivation:
         # OneOf unwrapping logic in deep_diff_structure should handle this
         diff = derive_schema_version.deep_diff_structure(base, target)
         assert "Sec" in diff["add"]
-        assert "B" in diff["add"]["Sec"]
+        assert "B" in diff["add"]["Sec"][derive_schema_version.NESTED]
 
     def test_apply_diff(self):
         base = {"properties": {"A": {}, "B": {}}}
@@ -89,17 +91,18 @@ class TestSchemaDerivation:
         # If Sec exists and we add B inside:
         # diff['add']['Sec'] = { 'B': ... } ??
         # Looking at deep_diff_structure:
-        # diff["add"][key] = sub_diff["add"]
-        # So yes, it nests the "add" part.
+        # diff["add"][key] = {NESTED: sub_diff["add"]}
+        # So yes, it nests the "add" part, tagged with the NESTED marker.
         
         # So to emulate a recursive add of C inside Sec:
+        nested = derive_schema_version.NESTED
         diff = {
-            "add": {"Sec": {"C": {"type": "string"}}},
-            "remove": {"Sec": {"B": True}}
+            "add": {"Sec": {nested: {"C": {"type": "string"}}}},
+            "remove": {"Sec": {nested: {"B": True}}}
         }
         
-        # NOTE: logic in apply_diff handles nested dicts in 'add' as recursion instructions 
-        # IF they don't look like property definitions (no 'type', 'properties', 'oneOf').
+        # NOTE: apply_diff treats entries tagged with NESTED as recursion instructions,
+        # anything else is a new property definition.
         
         new_schema = derive_schema_version.apply_diff(base, diff)
         
@@ -107,3 +110,60 @@ class TestSchemaDerivation:
         assert "A" in sec_props
         assert "B" not in sec_props
         assert "C" in sec_props
+
+    def test_apply_diff_does_not_mutate_curated(self):
+        untouched = {"properties": {"X": {}}}
+        base = {"properties": {"Sec": {"properties": {"A": {}, "B": {}}}, "Other": untouched}}
+        nested = derive_schema_version.NESTED
+        diff = {
+            "add": {"Sec": {nested: {"C": {"type": "string"}}}},
+            "remove": {"Sec": {nested: {"B": True}}}
+        }
+
+        new_schema = derive_schema_version.apply_diff(base, diff)
+
+        # Curated input is left as-is
+        assert set(base["properties"]["Sec"]["properties"]) == {"A", "B"}
+        # Subtrees outside the diff path are shared, not copied
+        assert new_schema["properties"]["Other"] is untouched
+        assert set(new_schema["properties"]["Sec"]["properties"]) == {"A", "C"}
+
+    def test_apply_diff_property_named_properties(self):
+        # A new property literally named "properties" must not be mistaken for a nested diff
+        base = {"properties": {"Sec": {"properties": {"A": {}}}}}
+        target = {"properties": {"Sec": {"properties": {"A": {}, "properties": {}}}}}
+
+        diff = derive_schema_version.deep_diff_structure(base, target)
+        new_schema = derive_schema_version.apply_diff(base, diff)
+
+        assert "properties" in new_schema["properties"]["Sec"]["properties"]
+
+    def test_apply_diff_copies_added_definitions(self):
+        base = {"properties": {"A": {}}}
+        definition = {"type": "object", "properties": {"X": {"enum": ["a", "b"]}}}
+        diff = {"add": {"B": definition}, "remove": {}}
+
+        new_schema = derive_schema_version.apply_diff(base, diff)
+
+        added = new_schema["properties"]["B"]
+        assert added == definition
+        assert added is not definition
+        assert added["properties"]["X"]["enum"] is not definition["properties"]["X"]["enum"]
+
+    def test_apply_diff_non_dict_property_schema(self):
+        curated = {"properties": {"A": {}}}
+        result = derive_schema_version.apply_diff(curated, {"add": {"B": True}, "remove": {"C": False}})
+        assert result["properties"] == {"A": {}, "B": True}
+
+    def test_dump_json_non_ascii(self, monkeypatch):
+        data = {"description": "Caf\u00e9 \u2013 na\u00efve", "default": None, "minimum": 0}
+        expected = derive_schema_version.dump_json(data)
+        monkeypatch.setattr(derive_schema_version, "orjson", None)
+        assert derive_schema_version.dump_json(data) == expected
+        assert "Café – naïve".encode('utf-8') in expected
+
+    def test_get_schema_version(self):
+        schema = {"title": "Systemd network Configuration (v245)"}
+        assert derive_schema_version.get_schema_version(schema, "x/systemd.network.v999.schema.json") == "v245"
+        # Falls back to the filename when the title has no version
+        assert derive_schema_version.get_schema_version({"title": "Untitled"}, "x/systemd.network.v241.schema.json") == "v241"
@@ -1,10 +1,14 @@
 import sys
 import os
+import shutil
+import tempfile
 import unittest
+from unittest import mock
 import xml.etree.ElementTree as ET
 
 # Allow importing from bin/
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'bin'))
+import generate_html
 from generate_html import HtmlGenerator, PageGenerator, TypesGenerator
 
 class TestHtmlGenerator(unittest.TestCase):
@@ -15,11 +19,13 @@ class TestHtmlGenerator(unittest.TestCase):
         return ET.fromstring(string)
 
     def test_linkify_section_references(self):
-        text = "See [Match] section."
-        self.assertEqual(self.generator.linkify_section_references(text), 'See <a href="#section-Match" class="section-ref">[Match]</a> section.')
-        self.assertEqual(self.generator.linkify_section_references(text, in_code_block=True), text)
-        text_assign = "Key=[Match]"
-        self.assertEqual(self.generator.linkify_section_references(text_assign), text_assign)
+        def render(xml):
+            return self.generator.render_docbook_content(self.parse_xml(f'<root>{xml}</root>'), "v257")
+        link = '<a href="#section-Match" class="section-ref">[Match]</a>'
+        self.assertEqual(render('<para>See [Match] section.</para>'), f'<p>See {link} section.</p>')
+        self.assertEqual(render('<para><literal>x</literal> and [Match]</para>'), f'<p><code>x</code> and {link}</p>')
+        self.assertEqual(render('<programlisting>[Match]</programlisting>'), '<pre><code>[Match]</code></pre>')
+        self.assertEqual(render('<para>Key=[Match]</para>'), '<p>Key=[Match]</p>')
 
     def test_render_docbook_para(self):
         elem = self.parse_xml('<root><para>Hello World</para></root>')
@@ -44,6 +50,14 @@ class TestHtmlGenerator(unittest.TestCase):
         self.assertIn("<dt>Term</dt>", html)
         self.assertIn("<dd><p>Desc</p></dd>", html)
 
+    def test_render_citerefentry(self):
+        def render(title):
+            elem = self.parse_xml(f'<root><citerefentry><refentrytitle>{title}</refentrytitle><manvolnum>5</manvolnum></citerefentry></root>')
+            return self.generator.render_docbook_content(elem, "v257")
+        self.assertEqual(render("systemd.netdev"), '<a href="systemd.netdev.html">systemd.netdev</a>')
+        self.assertEqual(render("ip"), '<a href="https://man7.org/linux/man-pages/man8/ip.8.html" target="_blank" class="external-link">ip</a>')
+        self.assertEqual(render("systemd-networkd"), '<a href="https://www.freedesktop.org/software/systemd/man/latest/systemd-networkd.html" target="_blank" class="external-link">systemd-networkd</a>')
+
 class TestPageGenerator(unittest.TestCase):
     def setUp(self):
         # Mock schema needs definitions for refs
@@ -75,6 +89,64 @@ class TestPageGenerator(unittest.TestCase):
         s = {'type': 'array', 'items': {'type': 'string'}}
         self.assertEqual(self.generator.calculate_type_label(s), 'string')
 
+    def test_resolve_chain(self):
+        s = {'allOf': [{'$ref': '#/definitions/fooType', 'default': 'x'}], 'x-category': 'basic'}
+        self.assertEqual(self.generator.resolve_all(s), {'title': 'Foo Object', 'type': 'object'})
+        chain = self.generator.resolve_chain(s)
+        self.assertEqual(len(chain), 3)
+        self.assertIs(chain[0], s)
+        self.assertIs(chain[1], s['allOf'][0])
+
+    def test_extract_option_data_inherits_through_refs(self):
+        self.generator.schema['definitions']['secType'] = {
+            'allOf': [{'$ref': '#/definitions/barType'}],
+            'default': 5, 'x-subcategory': 'Timers', 'x-category': 'advanced',
+        }
+        self.generator.schema['properties']['Link'] = {'required': ['Timeout']}
+        prop = {'$ref': '#/definitions/secType', 'x-category': 'basic'}
+        data = self.generator._extract_option_data('Timeout', 'Link', prop, None)
+        self.assertEqual(data['default'], 5)
+        self.assertEqual(data['category'], 'basic')
+        self.assertEqual(data['subcategory'], 'Required')
+        self.assertEqual(data['type_slug'], 'secType')
+        self.assertTrue(data['is_undocumented'])
+        self.assertEqual(data['desc_snippet'], data['desc_html'][:150])
+
+    def test_get_version_added(self):
+        entry = ET.fromstring('''
+        <varlistentry xmlns:xi="http://www.w3.org/2001/XInclude">
+            <term><varname>Name=</varname></term>
+            <listitem>
+                <para>Desc</para>
+                <xi:include href="other.xml" xpointer="v200"/>
+                <xi:include href="version-info.xml" xpointer="v245"/>
+            </listitem>
+        </varlistentry>
+        ''')
+        self.assertEqual(self.generator.get_version_added(entry), '245')
+        self.assertIsNone(self.generator.get_version_added(ET.fromstring('<varlistentry/>')))
+
+    def test_get_option_names(self):
+        entry = ET.fromstring('''
+        <varlistentry>
+            <term><varname>First=</varname></term>
+            <term><varname>Second=</varname><replaceable>VALUE</replaceable></term>
+            <listitem><para>Desc</para></listitem>
+        </varlistentry>
+        ''')
+        self.assertEqual(self.generator.get_all_option_names(entry), ['First', 'Second'])
+
+        ns_entry = ET.fromstring('''
+        <d:varlistentry xmlns:d="http://docbook.org/ns/docbook">
+            <d:term><d:varname>Name=</d:varname></d:term>
+            <d:listitem><d:para>Desc</d:para></d:listitem>
+        </d:varlistentry>
+        ''')
+        self.assertEqual(self.generator.get_all_option_names(ns_entry), ['Name'])
+        self.assertEqual(self.generator.get_description(ns_entry), '<p>Desc</p>')
+        self.assertEqual(self.generator._get_term_names(ET.fromstring('<varlistentry><term/><term><varname>B=</varname></term></varlistentry>')), ['', 'B'])
+        self.assertEqual(self.generator._get_term_names(ET.fromstring('<varlistentry/>')), [])
+
 class TestTypesGenerator(unittest.TestCase):
     def setUp(self):
         self.generator = TypesGenerator("/tmp", "v257")
@@ -99,5 +171,76 @@ class TestTypesGenerator(unittest.TestCase):
         self.assertIn("Integer", desc)
         self.assertIn(" OR ", desc)
 
+        # $ref to an untitled definition is described through the target
+        defs = {'portType': {'type': 'integer', 'minimum': 1, 'maximum': 65535}}
+        memo = {}
+        s5 = {'oneOf': [{'$ref': '#/definitions/portType'}, {'type': 'string'}]}
+        self.assertEqual(self.generator._describe_type_structure(s5, defs, memo), "Integer (1...65535) OR String")
+        self.assertEqual(memo, {'portType': "Integer (1...65535)"})
+
+    def test_group_types(self):
+        groups = self.generator._group_types({
+            'boolean': {'title': 'Boolean'},
+            'uint32Type': {'title': 'Unsigned'},
+            'secType': {'title': 'Duration in seconds'},
+            'ipv4Type': {'title': 'IPv4 Address'},
+            'qdiscType': {'title': 'Qdisc Handle'},
+            'ifnameType': {'title': 'Interface Name'},
+            'userType': {'title': 'User'},
+            'miscType': {'title': 'Misc'},
+        })
+        self.assertEqual(list(groups), ["Common Types", "Base Data Types", "Networking", "Traffic Control", "System & Identifiers", "Other"])
+        self.assertEqual([k for k, _ in groups["Base Data Types"]], ['secType', 'uint32Type'])
+        self.assertEqual([k for k, _ in groups["Networking"]], ['ifnameType', 'ipv4Type'])
+        self.assertEqual([k for k, _ in groups["Other"]], ['miscType'])
+
+class TestGeneratePages(unittest.TestCase):
+    DOC = '''<refentry xmlns:xi="http://www.w3.org/2001/XInclude">
+        <refsect1><title>[Match] Section Options</title>
+        <variablelist><varlistentry>
+            <term><varname>Name=</varname></term>
+            <listitem><para>Matches [Match] names.</para><xi:include href="version-info.xml" xpointer="v245"/></listitem>
+        </varlistentry></variablelist>
+        </refsect1></refentry>'''
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.src_dir = os.path.join(self.tmp, "src")
+        os.makedirs(self.src_dir)
+        for doc in ("systemd.network", "systemd.link"):
+            with open(os.path.join(self.src_dir, f"{doc}.xml"), "w") as f:
+                f.write(self.DOC)
+        with open(os.path.join(self.src_dir, "version-info.xml"), "w") as f:
+            f.write('<refentry><para id="v245">Added in version 245.</para></refentry>')
+        self.schema_dir = os.path.join(os.path.dirname(__file__), '..', 'schemas', 'v257')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def generate(self, out, workers):
+        out_dir = os.path.join(self.tmp, out)
+        os.makedirs(out_dir)
+        args = (out_dir, "v257", self.src_dir, self.schema_dir, False)
+        index = generate_html.generate_pages(args, ["v257", "latest"], True, workers)
+        pages = {}
+        for name in sorted(os.listdir(out_dir)):
+            with open(os.path.join(out_dir, name), "rb") as f:
+                pages[name] = f.read()
+        return index, pages
+
+    def test_sequential_pages_share_one_generator(self):
+        with mock.patch.object(generate_html.ET, 'parse', wraps=ET.parse) as parse:
+            index, pages = self.generate("seq", 1)
+        parsed = [os.path.basename(c.args[0]) for c in parse.call_args_list]
+        self.assertEqual(parsed.count("version-info.xml"), 1)
+        self.assertEqual(sorted(pages), ["systemd.link.html", "systemd.network.html"])
+        self.assertEqual([item['file'] for item in index][0], "systemd.network.html")
+        self.assertIn(os.path.join(self.src_dir, "version-info.xml"), generate_html.page_generator.include_cache)
+
+    def test_pool_matches_sequential(self):
+        seq = self.generate("seq", 1)
+        pool = self.generate("pool", 2)
+        self.assertEqual(pool, seq)
+
 if __name__ == '__main__':
     unittest.main()